@@ -8,20 +8,22 @@ Version: 2.0
 import argparse
 import math
 import re
-from typing import Dict, List, Tuple
+import string
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
 
 # Expanded common password lists
-COMMON_WORDS = {
+COMMON_WORDS = frozenset({
     "password", "admin", "welcome", "qwerty", "iloveyou", "letmein",
     "login", "user", "test", "secret", "dragon", "football", "monkey",
     "master", "sunshine", "princess", "starwars", "computer", "trustno1",
     "freedom", "whatever", "batman", "michael", "shadow", "hello",
     "cookie", "summer", "superman", "killer", "access", "654321"
-}
+})
 
 # Enhanced leetspeak mapping
-LEET_MAP = str.maketrans({
+LEET_MAP = {
     "@": "a", "4": "a", "^": "a",
     "8": "b", "|3": "b",
     "(": "c", "<": "c", "{": "c",
@@ -35,7 +37,14 @@ LEET_MAP = str.maketrans({
     "$": "s", "5": "s",
     "|_": "l",
     "2": "z",
-})
+}
+
+# Single-char substitutions go through str.translate; multi-char ones
+# are replaced first with one regex so "|3" is not read as "|" + "3"
+_LEET_TABLE = str.maketrans({k: v for k, v in LEET_MAP.items() if len(k) == 1})
+_RE_LEET_MULTI = re.compile("|".join(
+    map(re.escape, sorted((k for k in LEET_MAP if len(k) > 1), key=len, reverse=True))
+))
 
 # Keyboard patterns
 KEYBOARD_SEQUENCES = [
@@ -50,9 +59,80 @@ ALPHABET_SEQUENCES = [
 ]
 
 
-@dataclass
+def _build_trigram_index(sequences: List[str]) -> Dict[str, Tuple[int, ...]]:
+    """
+    Map every 3-char chunk of the sequences, forward and reversed,
+    to the ids of the chunks it matches
+    """
+    index = {}
+    chunk_id = 0
+    for sequence in sequences:
+        for i in range(len(sequence) - 2):
+            chunk = sequence[i:i+3]
+            for trigram in {chunk, chunk[::-1]}:
+                index.setdefault(trigram, []).append(chunk_id)
+            chunk_id += 1
+    return {trigram: tuple(ids) for trigram, ids in index.items()}
+
+
+# Trigram lookup tables for sequence and keyboard pattern detection
+_SEQ_3GRAMS = _build_trigram_index(ALPHABET_SEQUENCES + ["0123456789"])
+_KBD_3GRAMS = _build_trigram_index(KEYBOARD_SEQUENCES)
+
+# Precompiled pattern checks
+_RE_REPEATED_CHARS = re.compile(r"(.)\1{2,}")
+_RE_REPEATED_PATTERNS = re.compile(r"(.{2,4})\1+")
+_RE_YEAR = re.compile(r"(19\d{2}|20[0-3]\d)")
+_RE_COMMON_NUM = re.compile(r"123|234|456|789|000|111|999")
+
+# Characters commonly substituted for letters (p@ssw0rd style)
+_COMMON_SUBS = frozenset("@013$!")
+
+# Character class bits
+_LOWER_BIT = 1
+_UPPER_BIT = 2
+_DIGIT_BIT = 4
+_SYMBOL_BIT = 8
+
+
+def _char_class(c: str) -> int:
+    """Return the class bits for a single character"""
+    bits = 0
+    if c.islower(): bits |= _LOWER_BIT
+    if c.isupper(): bits |= _UPPER_BIT
+    if c.isdigit(): bits |= _DIGIT_BIT
+    if not c.isalnum(): bits |= _SYMBOL_BIT
+    return bits
+
+
+# ASCII character sets for the class tests
+_ASCII = frozenset(map(chr, range(128)))
+_ASCII_LOWER = frozenset(string.ascii_lowercase)
+_ASCII_UPPER = frozenset(string.ascii_uppercase)
+_DIGITS = frozenset(string.digits)
+_ASCII_SYMBOLS = _ASCII - _ASCII_LOWER - _ASCII_UPPER - _DIGITS
+
+# Character pool size and its log2 for every combination of class bits
+_VARIETY_TABLE = tuple(
+    (size, math.log2(size))
+    for size in (
+        max((26 if mask & _LOWER_BIT else 0)
+            + (26 if mask & _UPPER_BIT else 0)
+            + (10 if mask & _DIGIT_BIT else 0)
+            + (33 if mask & _SYMBOL_BIT else 0), 1)
+        for mask in range(16)
+    )
+)
+
+
+@dataclass(frozen=True)
 class PasswordMetrics:
     """Comprehensive password metrics"""
+    __slots__ = (
+        "length", "has_lower", "has_upper", "has_digit", "has_symbol",
+        "unique_chars", "entropy_bits", "charset_size",
+    )
+    
     length: int
     has_lower: bool
     has_upper: bool
@@ -61,39 +141,53 @@ class PasswordMetrics:
     unique_chars: int
     entropy_bits: float
     charset_size: int
+    
+    def __getstate__(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+    
+    def __setstate__(self, state: Tuple) -> None:
+        # Frozen instances reject normal assignment, so restore the slots directly
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
 
 
 def analyze_character_composition(password: str) -> PasswordMetrics:
     """Analyze the character composition of the password"""
-    has_lower = any(c.islower() for c in password)
-    has_upper = any(c.isupper() for c in password)
-    has_digit = any(c.isdigit() for c in password)
-    has_symbol = any(not c.isalnum() for c in password)
-    
-    # Calculate character pool size
-    charset_size = 0
-    if has_lower: charset_size += 26
-    if has_upper: charset_size += 26
-    if has_digit: charset_size += 10
-    if has_symbol: charset_size += 33
-    charset_size = max(charset_size, 1)
+    # The set of distinct characters gives the unique character count;
+    # building it runs in C, which beats a per-byte bitmask loop written in Python
+    unique = set(password)
+    
+    # ASCII classes come from set tests, all done in C
+    mask = 0
+    if not _ASCII_LOWER.isdisjoint(unique): mask |= _LOWER_BIT
+    if not _ASCII_UPPER.isdisjoint(unique): mask |= _UPPER_BIT
+    if not _DIGITS.isdisjoint(unique): mask |= _DIGIT_BIT
+    if not _ASCII_SYMBOLS.isdisjoint(unique): mask |= _SYMBOL_BIT
+    
+    # Only non-ASCII characters need the Unicode-aware str predicates
+    if not password.isascii():
+        for c in unique - _ASCII:
+            mask |= _char_class(c)
+    
+    # Look up character pool size and bits per character
+    charset_size, bits_per_char = _VARIETY_TABLE[mask]
     
     # Calculate theoretical entropy
-    entropy_bits = len(password) * math.log2(charset_size)
+    entropy_bits = len(password) * bits_per_char
     
     return PasswordMetrics(
         length=len(password),
-        has_lower=has_lower,
-        has_upper=has_upper,
-        has_digit=has_digit,
-        has_symbol=has_symbol,
-        unique_chars=len(set(password)),
+        has_lower=bool(mask & _LOWER_BIT),
+        has_upper=bool(mask & _UPPER_BIT),
+        has_digit=bool(mask & _DIGIT_BIT),
+        has_symbol=bool(mask & _SYMBOL_BIT),
+        unique_chars=len(unique),
         entropy_bits=entropy_bits,
         charset_size=charset_size
     )
 
 
-def detect_patterns(password: str) -> Dict[str, int]:
+def detect_patterns(password: str, lower: Optional[str] = None) -> Dict[str, int]:
     """Detect various patterns that weaken passwords"""
     patterns = {
         "sequential": 0,
@@ -103,115 +197,130 @@ def detect_patterns(password: str) -> Dict[str, int]:
         "common_substitutions": 0,
     }
     
-    lower_pass = password.lower()
-    
-    # Check for alphabet/number sequences (3+ chars)
-    for sequence in ALPHABET_SEQUENCES + ["0123456789"]:
-        for i in range(len(sequence) - 2):
-            chunk = sequence[i:i+3]
-            if chunk in lower_pass or chunk[::-1] in lower_pass:
-                patterns["sequential"] += 1
+    lower_pass = password.lower() if lower is None else lower
     
-    # Check for keyboard patterns
-    for kbd_seq in KEYBOARD_SEQUENCES:
-        for i in range(len(kbd_seq) - 2):
-            chunk = kbd_seq[i:i+3]
-            if chunk in lower_pass or chunk[::-1] in lower_pass:
-                patterns["keyboard_patterns"] += 1
+    # Check for alphabet/number sequences and keyboard patterns (3+ chars),
+    # counting each matched sequence chunk once
+    trigrams = {lower_pass[i:i+3] for i in range(len(lower_pass) - 2)}
+    seq_hits = set()
+    for trigram in _SEQ_3GRAMS.keys() & trigrams:
+        seq_hits.update(_SEQ_3GRAMS[trigram])
+    kbd_hits = set()
+    for trigram in _KBD_3GRAMS.keys() & trigrams:
+        kbd_hits.update(_KBD_3GRAMS[trigram])
+    patterns["sequential"] = len(seq_hits)
+    patterns["keyboard_patterns"] = len(kbd_hits)
     
     # Repeated characters (aaa, 111, etc.)
-    if re.search(r"(.)\1{2,}", password):
-        patterns["repeated_chars"] = len(re.findall(r"(.)\1{2,}", password))
+    patterns["repeated_chars"] = len(_RE_REPEATED_CHARS.findall(password))
     
     # Repeated patterns (abab, 123123, etc.)
-    for pattern_len in [2, 3, 4]:
-        pattern = f"(.{{{pattern_len}}})" + f"\\1{{{1},}}"
-        if re.search(pattern, password):
-            patterns["repeated_patterns"] += 1
+    patterns["repeated_patterns"] = len(_RE_REPEATED_PATTERNS.findall(password))
     
     # Common substitutions (p@ssw0rd style)
-    common_subs = ["@", "0", "1", "3", "$", "!"]
-    patterns["common_substitutions"] = sum(1 for c in password if c in common_subs)
+    patterns["common_substitutions"] = sum(map(password.count, _COMMON_SUBS))
     
     return patterns
 
 
-def check_dictionary(password: str) -> Tuple[int, List[str]]:
+def check_dictionary(password: str,
+                     lower: Optional[str] = None) -> Tuple[int, List[str]]:
     """Check against common words with leetspeak normalization"""
     matches = []
-    plain = password.lower()
+    plain = password.lower() if lower is None else lower
     
-    # Simple leetspeak normalization
-    normalized = plain
-    for leet, normal in LEET_MAP.items():
-        normalized = normalized.replace(leet, normal)
+    # Leetspeak normalization
+    normalized = _RE_LEET_MULTI.sub(lambda m: LEET_MAP[m.group()], plain)
+    normalized = normalized.translate(_LEET_TABLE)
     
     for word in COMMON_WORDS:
         if word in plain or word in normalized:
             matches.append(word)
     
     # Check for year patterns (1990-2030)
-    years = re.findall(r"(19\d{2}|20[0-3]\d)", password)
+    years = _RE_YEAR.findall(password)
     if years:
         matches.extend([f"year:{y}" for y in years])
     
     # Check for common number patterns
-    if re.search(r"123|234|456|789|000|111|999", password):
+    if _RE_COMMON_NUM.search(password):
         matches.append("common_numbers")
     
     return len(matches), matches
 
 
+# Units used when formatting crack times, largest first
+_TIME_INTERVALS = (
+    ("century", 3155760000),
+    ("year", 31557600),
+    ("month", 2629800),
+    ("week", 604800),
+    ("day", 86400),
+    ("hour", 3600),
+    ("minute", 60),
+    ("second", 1),
+)
+
+# Different attack scenarios
+_SCENARIOS = {
+    "offline_fast": 1e12,      # GPU cluster (1 trillion/sec)
+    "offline_slow": 1e9,       # Standard GPU (1 billion/sec)
+    "online_throttled": 1e3,   # Online with rate limiting (1000/sec)
+    "online_strict": 1e1,      # Strict online (10/sec)
+}
+
+
+def format_time(seconds: float) -> str:
+    """Format a duration in seconds using its largest whole unit"""
+    if seconds < 1:
+        return "< 1 second"
+    
+    for name, seconds_in_unit in _TIME_INTERVALS:
+        if seconds >= seconds_in_unit:
+            value = seconds / seconds_in_unit
+            plural = "s" if value >= 2 else ""
+            return f"{value:.1f} {name}{plural}"
+    
+    return f"{seconds:.2f} seconds"
+
+
 def calculate_crack_time(entropy_bits: float) -> Dict[str, str]:
     """
     Estimate time to crack password under different scenarios
     """
-    def format_time(seconds: float) -> str:
-        if seconds < 1:
-            return "< 1 second"
-        
-        intervals = [
-            ("century", 3155760000),
-            ("year", 31557600),
-            ("month", 2629800),
-            ("week", 604800),
-            ("day", 86400),
-            ("hour", 3600),
-            ("minute", 60),
-            ("second", 1),
-        ]
-        
-        for name, seconds_in_unit in intervals:
-            if seconds >= seconds_in_unit:
-                value = seconds / seconds_in_unit
-                plural = "s" if value >= 2 else ""
-                return f"{value:.1f} {name}{plural}"
-        
-        return f"{seconds:.2f} seconds"
-    
-    # Different attack scenarios
-    scenarios = {
-        "offline_fast": 1e12,      # GPU cluster (1 trillion/sec)
-        "offline_slow": 1e9,       # Standard GPU (1 billion/sec)
-        "online_throttled": 1e3,   # Online with rate limiting (1000/sec)
-        "online_strict": 1e1,      # Strict online (10/sec)
-    }
-    
     # Average attempts = 2^(bits-1)
-    average_attempts = 2 ** max(entropy_bits - 1, 0)
+    average_attempts = 2.0 ** max(entropy_bits - 1, 0)
     
     estimates = {}
-    for scenario, rate in scenarios.items():
+    for scenario, rate in _SCENARIOS.items():
         seconds = average_attempts / rate
         estimates[scenario] = format_time(seconds)
     
     return estimates
 
 
-def score_password(password: str) -> Dict:
+class _ScoreResult(NamedTuple):
+    """Immutable scoring result kept in the scoring cache"""
+    score: int
+    label: str
+    strength_level: int
+    color: str
+    feedback: Tuple[str, ...]
+    metrics: PasswordMetrics
+    patterns: Tuple[Tuple[str, int], ...]
+    dict_hits: int
+    dict_words: Tuple[str, ...]
+
+
+def score_password(password: str, include_crack_time: bool = True) -> Dict:
     """
     Comprehensive password scoring algorithm
     Returns score (0-100), label, and detailed feedback
+    Crack time estimates are None when include_crack_time is False
+
+    Results are cached, so up to 4096 recently scored passwords stay in
+    memory as plaintext for the life of the process; call
+    _score_password_cached.cache_clear() to drop them
     """
     if not password:
         return {
@@ -220,14 +329,56 @@ def score_password(password: str) -> Dict:
             "strength_level": 0,
             "entropy_bits": 0.0,
             "feedback": ["Password cannot be empty"],
-            "crack_time": calculate_crack_time(0),
+            "crack_time": calculate_crack_time(0) if include_crack_time else None,
             "details": {}
         }
     
+    result = _score_password_cached(password)
+    metrics = result.metrics
+    
+    return {
+        "score": result.score,
+        "label": result.label,
+        "strength_level": result.strength_level,
+        "color": result.color,
+        "entropy_bits": round(metrics.entropy_bits, 2),
+        "feedback": list(result.feedback),
+        "crack_time": (calculate_crack_time(metrics.entropy_bits)
+                       if include_crack_time else None),
+        "details": {
+            "length": metrics.length,
+            "unique_chars": metrics.unique_chars,
+            "charset_size": metrics.charset_size,
+            "patterns_found": sum(count for _, count in result.patterns),
+            "dictionary_hits": result.dict_hits,
+            "patterns": dict(result.patterns),
+            "dictionary_matches": list(result.dict_words) if result.dict_words else None,
+        }
+    }
+
+
+def score_passwords(passwords: Iterable[str],
+                    include_crack_time: bool = True) -> List[Dict]:
+    """
+    Score many passwords, e.g. when auditing a password list
+    Pass include_crack_time=False to skip the crack time estimates; a
+    repeat is only served from the scoring cache while it is among the
+    4096 most recently scored passwords
+    """
+    return [score_password(password, include_crack_time) for password in passwords]
+
+
+@lru_cache(maxsize=4096)
+def _score_password_cached(password: str) -> _ScoreResult:
+    """
+    Score a non-empty password
+    Everything returned is immutable so results can be shared between calls
+    """
     # Analyze password
+    lower = password.lower()
     metrics = analyze_character_composition(password)
-    patterns = detect_patterns(password)
-    dict_hits, dict_words = check_dictionary(password)
+    patterns = detect_patterns(password, lower)
+    dict_hits, dict_words = check_dictionary(password, lower)
     
     # Initialize score
     score = 0
@@ -348,24 +499,17 @@ def score_password(password: str) -> Dict:
     elif score >= 60 and len(feedback) <= 1:
         feedback.append("✅ Good password strength")
     
-    return {
-        "score": score,
-        "label": label,
-        "strength_level": strength_level,
-        "color": color,
-        "entropy_bits": round(metrics.entropy_bits, 2),
-        "feedback": feedback,
-        "crack_time": calculate_crack_time(metrics.entropy_bits),
-        "details": {
-            "length": length,
-            "unique_chars": metrics.unique_chars,
-            "charset_size": metrics.charset_size,
-            "patterns_found": sum(patterns.values()),
-            "dictionary_hits": dict_hits,
-            "patterns": patterns,
-            "dictionary_matches": dict_words if dict_words else None,
-        }
-    }
+    return _ScoreResult(
+        score=score,
+        label=label,
+        strength_level=strength_level,
+        color=color,
+        feedback=tuple(feedback),
+        metrics=metrics,
+        patterns=tuple(patterns.items()),
+        dict_hits=dict_hits,
+        dict_words=tuple(dict_words),
+    )
 
 
 def main():